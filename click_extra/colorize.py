@@ -21,12 +21,12 @@ from __future__ import annotations
 import os
 import re
 from configparser import RawConfigParser
+from functools import lru_cache, partial
 from gettext import gettext as _
-from operator import getitem
-from typing import NamedTuple
+from itertools import chain
+from typing import Callable, Collection, Iterable, Mapping, NamedTuple
+from weakref import WeakKeyDictionary
 
-import regex as re3
-from boltons.strutils import complement_int_list, int_ranges_from_int_list
 from cloup._util import identity
 from cloup.styling import IStyle
 
@@ -158,25 +158,40 @@ default_theme = HelpExtraTheme(
 nocolor_theme = HelpExtraTheme()
 
 
-OK = default_theme.success("✓")
-KO = default_theme.error("✘")
+# Hard-coded renderings of default_theme.success("✓") and default_theme.error("✘").
+OK = "\x1b[32m✓\x1b[0m"
+KO = "\x1b[31m✘\x1b[0m"
 """Pre-rendered UI-elements."""
 
+_ENABLE_VARS = frozenset(
+    (
+        "COLOR",
+        "COLORS",
+        "CLICOLOR",
+        "CLICOLORS",
+        "FORCE_COLOR",
+        "FORCE_COLORS",
+        "CLICOLOR_FORCE",
+        "CLICOLORS_FORCE",
+    )
+)
+"""Environment variables whose presence encodes for colorization."""
+
+_DISABLE_VARS = frozenset(
+    (
+        "NOCOLOR",
+        "NOCOLORS",
+        "NO_COLOR",
+        "NO_COLORS",
+    )
+)
+"""Environment variables whose presence encodes for color stripping."""
+
+_ALL_COLOR_VARS = _ENABLE_VARS | _DISABLE_VARS
+
 color_env_vars = {
-    # Colors.
-    "COLOR": True,
-    "COLORS": True,
-    "CLICOLOR": True,
-    "CLICOLORS": True,
-    "FORCE_COLOR": True,
-    "FORCE_COLORS": True,
-    "CLICOLOR_FORCE": True,
-    "CLICOLORS_FORCE": True,
-    # No colors.
-    "NOCOLOR": False,
-    "NOCOLORS": False,
-    "NO_COLOR": False,
-    "NO_COLORS": False,
+    **{var: True for var in sorted(_ENABLE_VARS)},
+    **{var: False for var in sorted(_DISABLE_VARS)},
 }
 """List of environment variables recognized as flags to switch color rendering on or
 off.
@@ -188,6 +203,26 @@ Source: https://github.com/pallets/click/issues/558
 """
 
 
+@lru_cache(maxsize=4)
+def _env_color_signal(env_vars: tuple[tuple[str, str], ...]) -> frozenset[bool]:
+    """Interpret the values of color-related environment variables.
+
+    ``env_vars`` is a tuple of ``(name, value)`` pairs of the variables set in the
+    environment. Returns the set of ``--color`` flag values they encode for.
+
+    The environment rarely changes during the life of a process, so the result is
+    cached against the raw values of the variables.
+    """
+    colorize_from_env = set()
+    for var, var_value in env_vars:
+        # `os.environ` is a dict whose all values are strings. Here we normalize
+        # these string into booleans. If we can't, we fallback to True, as the
+        # presence of the variable in the environment encodes for an activation.
+        var_boolean = RawConfigParser.BOOLEAN_STATES.get(var_value.lower(), True)
+        colorize_from_env.add((var in _ENABLE_VARS) ^ (not var_boolean))
+    return frozenset(colorize_from_env)
+
+
 class ColorOption(ExtraOption):
     """A pre-configured option that is adding a ``--color``/``--no-color`` (aliased by
     ``--ansi``/``--no-ansi``) option to keep or strip colors and ANSI codes from CLI
@@ -205,19 +240,11 @@ class ColorOption(ExtraOption):
         the provided value.
         """
         # Collect all colorize flags in environment variables we recognize.
-        colorize_from_env = set()
-        for var, default in color_env_vars.items():
-            if var in os.environ:
-                # Presence of the variable in the environment without a value encodes
-                # for an activation, hence the default to True.
-                var_value = os.environ.get(var, "true")
-                # `os.environ` is a dict whose all values are strings. Here we normalize
-                # these string into booleans. If we can't, we fallback to True, in the
-                # same spirit as above.
-                var_boolean = RawConfigParser.BOOLEAN_STATES.get(
-                    var_value.lower(), True
-                )
-                colorize_from_env.add(default ^ (not var_boolean))
+        # Only inspect the few variables actually set, which are usually none.
+        present = sorted(os.environ.keys() & _ALL_COLOR_VARS)
+        colorize_from_env = _env_color_signal(
+            tuple((var, os.environ[var]) for var in present)
+        )
 
         # Re-interpret the provided value against the recognized environment variables.
         if colorize_from_env:
@@ -303,6 +330,22 @@ class HelpOption(ExtraOption):
         )
 
 
+def sort_keywords(keywords: Iterable[str]) -> tuple[str, ...]:
+    """Deduplicate and sort keywords from the longest to the shortest.
+
+    Keywords of the same length are sorted alphabetically to produce a stable order.
+    Longest keywords come first so regular expressions matching alternations of them
+    prefer the maximal match.
+    """
+    return tuple(sorted(set(keywords), key=lambda k: (-len(k), k)))
+
+
+@lru_cache(maxsize=1024)
+def _normalized_keywords(keywords: tuple[str, ...]) -> tuple[str, ...]:
+    """Cached version of :py:func:`sort_keywords`, indexed by the original tuple."""
+    return sort_keywords(keywords)
+
+
 class ExtraHelpColorsMixin:
     """Adds extra-keywords highlighting to Click commands.
 
@@ -317,7 +360,8 @@ class ExtraHelpColorsMixin:
         cli_names: set[str] = set()
         subcommands: set[str] = set()
         command_aliases: set[str] = set()
-        options: set[str] = set()
+        long_options: set[str] = set()
+        short_options: set[str] = set()
         choices: set[str] = set()
         metavars: set[str] = set()
 
@@ -337,50 +381,90 @@ class ExtraHelpColorsMixin:
                 sub_cmd = command.get_command(ctx, sub_id)
                 command_aliases.update(getattr(sub_cmd, "aliases", []))
 
+        # Option names are directly dispatched between shorts and long options:
+        # - Short options no longer than 2 characters like "-D", "/d", "/?", "+w",
+        #   "-w", "f_", "_f", ...)
+        # - Any other is considered a long options. Like: "--debug", "--c", "-otest",
+        #   "---debug", "-vvvv, "++foo", "/debug", "from_", "_from", ...
+        # TODO: reuse ctx._opt_prefixes for finer match?
+
         # Add user defined help options.
-        options.update(ctx.help_option_names)
+        for option_name in ctx.help_option_names:
+            (short_options if len(option_name) <= 2 else long_options).add(option_name)
 
         # Collect all option names and choice keywords.
         for param in command.params:
-            options.update(param.opts)
-            options.update(param.secondary_opts)
+            for option_name in chain(param.opts, param.secondary_opts):
+                (short_options if len(option_name) <= 2 else long_options).add(
+                    option_name
+                )
 
             if isinstance(param.type, Choice):
                 choices.update(param.type.choices)
 
             metavars.add(param.make_metavar())
 
-        # Split between shorts and long options
-        long_options: set[str] = set()
-        short_options: set[str] = set()
-        for option_name in options:
-            # TODO: reuse ctx._opt_prefixes for finer match?
-            # Short options no longer than 2 characters like "-D", "/d", "/?", "+w",
-            # "-w", "f_", "_f", ...)
-            if len(option_name) <= 2:
-                short_options.add(option_name)
-            # Any other is considered a long options. Like: "--debug", "--c", "-otest",
-            # "---debug", "-vvvv, "++foo", "/debug", "from_", "_from", ...
-            else:
-                long_options.add(option_name)
-
+        # Keywords are returned as sorted tuples, ready to build and cache regular
+        # expressions.
         return (
-            cli_names,
-            subcommands,
-            command_aliases,
-            long_options,
-            short_options,
-            choices,
-            metavars,
+            sort_keywords(cli_names),
+            sort_keywords(subcommands),
+            sort_keywords(command_aliases),
+            sort_keywords(long_options),
+            sort_keywords(short_options),
+            sort_keywords(choices),
+            sort_keywords(metavars),
         )
 
+    help_cache_enabled: bool = False
+    """Cache rendered help screens.
+
+    Disabled by default, as help screens are not always deterministic: default values
+    can be sourced from configuration files or environment variables. Only activate it
+    for commands whose help screen is static.
+    """
+
+    _help_cache: WeakKeyDictionary = WeakKeyDictionary()
+    """Rendered help screens, indexed by command instance, then by rendering
+    settings."""
+
+    @classmethod
+    def clear_help_cache(cls) -> None:
+        """Flush all cached help screens."""
+        cls._help_cache.clear()
+
     def get_help(self, ctx):
-        """Replace default formatter by our own."""
+        """Replace default formatter by our own.
+
+        If ``help_cache_enabled`` is set, reuse the help screen previously rendered
+        for the same command path, color flag, terminal width and help option names.
+        """
         ctx.formatter_class = HelpExtraFormatter
-        return super().get_help(ctx)
+        if not self.help_cache_enabled:
+            return super().get_help(ctx)
+
+        # Reproduce click.Command.get_help() around the cache lookup, as we need the
+        # formatter to get the effective width of the help screen.
+        formatter = ctx.make_formatter()
+        cache_key = (
+            ctx.command_path,
+            ctx.color,
+            formatter.width,
+            tuple(ctx.help_option_names),
+        )
+        command_cache = self._help_cache.setdefault(self, {})
+        if cache_key not in command_cache:
+            self.format_help(ctx, formatter)
+            command_cache[cache_key] = formatter.getvalue().rstrip("\n")
+        return command_cache[cache_key]
 
     def format_help(self, ctx, formatter):
-        """Feed our custom formatter instance with the keywords to highlight."""
+        """Feed our custom formatter instance with the keywords to highlight.
+
+        Also attach the context to the formatter, so it can skip highlighting if colors
+        are disabled.
+        """
+        formatter.ctx = ctx
         (
             formatter.cli_names,
             formatter.subcommands,
@@ -393,16 +477,159 @@ class ExtraHelpColorsMixin:
         return super().format_help(ctx, formatter)
 
 
+@lru_cache(maxsize=2048)
 def escape_for_help_sceen(text: str) -> str:
     """Escape a text to be used in a regural expression to match help screen.
 
     Like ``re.escape``, but allows any number of optional blank characters (line
     returns, spaces, tabs) after a dash, to accounts for text wrapping rules and
     columnar layout.
+
+    Results are cached, as the same keywords are escaped over and over when help
+    screens are rendered.
     """
     return re.escape(text).replace("-", "-\\s*")
 
 
+DEPRECATED_PATTERN = rf"""
+    (?<=\s)                                          # Any blank char.
+    (?P<warning>(?i:{re.escape("(DEPRECATED)")}))    # The flag string, in any case.
+"""
+"""Matches `` (Deprecated)`` or `` (DEPRECATED)`` labels."""
+
+DEFAULT_PATTERN = r"""
+    (?<=\ \ )               # 2 spaces (column spacing or description spacing).
+    (?P<default_start>
+        \[                  # Square brackets opening.
+        default:            # Starting content within the brackets.
+        \s+                 # Any number of blank chars.
+    )
+    (?P<default_value>(?s:.+?))  # Greedy-matching of any string and line returns.
+    (?P<default_end>\])     # Square brackets closing.
+"""
+"""Matches ``[default: value]`` annotations."""
+
+
+def _alternation(keywords: tuple[str, ...]) -> str:
+    """Produce a regular expression alternation matching any of the ``keywords``."""
+    return "|".join(re.escape(keyword) for keyword in keywords)
+
+
+@lru_cache(maxsize=4096)
+def _compile_alias_pattern(aliases: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile and cache the regular expression matching any subcommand's alias within
+    a list of aliases."""
+    return re.compile(
+        rf"""
+        (?<!\S)          # Start of list or any blank char.
+        (?P<command_aliases>{_alternation(aliases)})
+        (?![^\s,])       # End of list, a blank char or a comma.
+        """,
+        flags=re.VERBOSE,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compile_help_pattern(
+    cli_names: tuple[str, ...],
+    subcommands: tuple[str, ...],
+    command_aliases: tuple[str, ...],
+    long_options: tuple[str, ...],
+    short_options: tuple[str, ...],
+    choices: tuple[str, ...],
+    metavars: tuple[str, ...],
+) -> re.Pattern[str]:
+    """Compile and cache a single regular expression matching all extra keywords of a
+    help screen.
+
+    Each kind of keyword is an alternative of the master pattern, listed by priority: at
+    any position of the help screen, the first alternative matching wins. All
+    alternatives match their surroundings with lookarounds instead of consuming them,
+    so adjacent keywords (like in ``[apm|apt]``) are all highlighted in the same scan.
+
+    Keywords are expected to be sorted from the longest to the shortest (see
+    :py:func:`sort_keywords`) so the regex engine always prefer the maximal match (i.e.
+    ``apt-mint`` over ``apt``).
+    """
+    alternatives = [DEPRECATED_PATTERN]
+
+    if subcommands or command_aliases:
+        if subcommands:
+            subcommand = rf"(?P<subcommand>{_alternation(subcommands)})"
+        else:
+            # Without known subcommands, aliases are still highlighted after any word.
+            subcommand = r"(\S+)"
+        aliases_list = ""
+        if command_aliases:
+            # The list of aliases is optional after known subcommands.
+            optional = "?" if subcommands else ""
+            aliases_list = rf"""
+            (?:
+                (\ \()                      # A space and an opening parenthesis.
+                (?P<aliases_list>[^)\n]+)   # The list of aliases.
+                (\))                        # A closing parenthesis.
+            ){optional}
+            """
+        alternatives.append(
+            rf"""
+            (?<=\ \ )                     # 2 spaces (i.e. section indention).
+            {subcommand}
+            {aliases_list}
+            (?=\s)                        # Any blank char.
+            """
+        )
+
+    alternatives.append(DEFAULT_PATTERN)
+
+    if cli_names:
+        alternatives.append(
+            rf"""
+            (?<=\s)                                         # Any blank char.
+            (?P<invoked_command>{_alternation(cli_names)})  # The CLI name.
+            (?=\s)                                          # Any blank char.
+            """
+        )
+
+    for keywords, group_id in (
+        (long_options, "long_option"),
+        (short_options, "short_option"),
+        (choices, "choice"),
+        (metavars, "metavar"),
+    ):
+        if not keywords:
+            continue
+        alternation = "|".join(escape_for_help_sceen(keyword) for keyword in keywords)
+        alternatives.append(
+            rf"""
+            (?<=[            # A keyword is preceded with either:
+                \s           # - a blank char
+                \[           # - an opening square bracket (as in choice string)
+                \|           # - a pipe (again like in choice strings)
+                \(           # - an opening parenthesis
+            ])
+            (?P<{group_id}>{alternation})
+            (?=\W)           # Any character which is not a word character.
+            """
+        )
+
+    return re.compile(
+        "|".join(f"(?:{alternative})" for alternative in alternatives),
+        flags=re.VERBOSE,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _group_ids(pattern: re.Pattern[str]) -> tuple[str | None, ...]:
+    """Returns the ID of each group of a compiled regular expression, in order.
+
+    Unnamed groups are returned as ``None``.
+    """
+    group_ids: list[str | None] = [None] * pattern.groups
+    for group_id, index in pattern.groupindex.items():
+        group_ids[index - 1] = group_id
+    return tuple(group_ids)
+
+
 class HelpExtraFormatter(HelpFormatter):
     """Extends Cloup's custom HelpFormatter to highlights options, choices, metavars and
     default values.
@@ -427,51 +654,66 @@ class HelpExtraFormatter(HelpFormatter):
         kwargs["theme"] = theme
         super().__init__(*args, **kwargs)
 
+        # Resolve once and for all the style of each group ID. Styles directly named
+        # by the group ID take precedence over aliases.
+        self._group_style = {
+            group_id: getattr(self.theme, theme_field)
+            for group_id, theme_field in self.style_aliases.items()
+        }
+        self._group_style.update(self.theme._asdict())
+
+    ctx: Context | None = None
+    """Context of the command whose help screen is being rendered, if any."""
+
     # Lists of extra keywords to highlight.
-    cli_names: set[str] = set()
-    subcommands: set[str] = set()
-    command_aliases: set[str] = set()
-    long_options: set[str] = set()
-    short_options: set[str] = set()
-    choices: set[str] = set()
-    metavars: set[str] = set()
+    cli_names: Collection[str] = set()
+    subcommands: Collection[str] = set()
+    command_aliases: Collection[str] = set()
+    long_options: Collection[str] = set()
+    short_options: Collection[str] = set()
+    choices: Collection[str] = set()
+    metavars: Collection[str] = set()
     # TODO
-    default_values: set[str] = set()
+    default_values: Collection[str] = set()
 
     # TODO: Hihglight extra keywords <stdout> or <stderr>
 
+    style_aliases = {
+        "default_start": "metavar",
+        "default_end": "metavar",
+        "default_value": "choice",
+        "subcommand": "option",
+        "command_aliases": "option",
+        "long_option": "option",
+        "short_option": "option",
+    }
+    """Map regular expression group IDs to the theme property used to style them,
+    for groups not directly named after a theme property."""
+
     def style_group(self, str_to_style: str, group_id: str):
-        style_alias = {
-            "default_start": self.theme.metavar,
-            "default_end": self.theme.metavar,
-            "default_value": self.theme.choice,
-            "subcommand": self.theme.option,
-            "command_aliases": self.theme.option,
-            "long_option": self.theme.option,
-            "short_option": self.theme.option,
-        }
-        # Get the style directly named by the group ID. Else inspect the
-        # style_alias above.
-        group_style = getattr(self.theme, group_id, None)
-        if not group_style:
-            group_style = style_alias[group_id]
-        return group_style(str_to_style)
-
-    def colorize(self, match: re.Match) -> str:
+        return self._group_style[group_id](str_to_style)
+
+    def colorize(
+        self,
+        match: re.Match[str],
+        group_style: Mapping[str, Callable[[str], str]] | None = None,
+    ) -> str:
         """Recreate the matching string by concatenating all groups, but only colorize
-        named groups with using the function provided in ``style_map``."""
-        # Invert the group dictionnary to we can get the group ID of a match.
-        match_group = {v: k for k, v in match.groupdict().items()}
-        assert len(match_group) == len(match.groupdict())
-
-        txt = ""
-        for group in match.groups():
-            if group in match_group:
-                group_id = match_group[group]
-                txt += self.style_group(group, group_id)
-            else:
-                txt += group
-        return txt
+        named groups with using the function provided in ``group_style``.
+
+        Defaults to the styles of the theme if ``group_style`` is not provided.
+        """
+        if group_style is None:
+            group_style = self._group_style
+        txt = []
+        for group_id, group in zip(_group_ids(match.re), match.groups()):
+            # Skip groups not participating in the match.
+            if group is None:
+                continue
+            if group_id:
+                group = group_style[group_id](group)
+            txt.append(group)
+        return "".join(txt)
 
     def highlight_extra_keywords(self, help_text):
         """Highlight extra keywords in help screens based on the theme.
@@ -480,87 +722,60 @@ class HelpExtraFormatter(HelpFormatter):
         is good enough. After all, help screens are not consumed by machine but are
         designed for humans.
         """
-        # Highlight " (Deprecated)" or " (DEPRECATED)" labels, as set by either:
-        # https://github.com/pallets/click/blob/ef11be6e49e19a055fe7e5a89f0f1f4062c68dba/tests/test_commands.py#L345
-        # https://github.com/janluke/cloup/blob/c29fa051ed405856ed8bc2dbd733f9df2c8e6418/cloup/formatting/_formatter.py#L188
-        help_text = re.sub(
-            rf"""
-            (\s)                                      # Any blank char.
-            (?P<warning>{re.escape("(DEPRECATED)")})  # The flag string.
-            """,
-            self.colorize,
-            help_text,
-            flags=re.VERBOSE | re.IGNORECASE,
-        )
-
-        # Highligh subcommands' aliases.
-        for alias in self.command_aliases:
-            help_text = re.sub(
-                rf"""
-                (
-                    \ \                       # 2 spaces (i.e. section indention).
-                    \S+                       # Any subcommand.
-                    \                         # A space.
-                    \(                        # An opening parenthesis.
-                    .*                        # Any string.
-                )
-                (?P<command_aliases>{re.escape(alias)})  # The alias.
-                (
-                    .*                        # Any string.
-                    \)                        # A closing parenthesis.
-                )
-                """,
-                self.colorize,
-                help_text,
-                flags=re.VERBOSE,
-            )
-
-        # Highligh subcommands.
-        for subcommand in self.subcommands:
-            help_text = re.sub(
-                rf"""
-                (\ \ )                        # 2 spaces (i.e. section indention).
-                (?P<subcommand>{re.escape(subcommand)})
-                (\s)                          # Any blank char.
-                """,
-                self.colorize,
-                help_text,
-                flags=re.VERBOSE,
+        # Keywords are always normalized, as the attributes are public and may be set
+        # to any collection. Normalization is cached, so the tuples produced by
+        # ExtraHelpColorsMixin.collect_keywords() are only sorted once.
+        keywords = tuple(
+            _normalized_keywords(tuple(keywords))
+            for keywords in (
+                self.cli_names,
+                self.subcommands,
+                self.command_aliases,
+                self.long_options,
+                self.short_options,
+                self.choices,
+                self.metavars,
             )
-
-        # Highligh defaults.
-        help_text = re.sub(
-            r"""
-            (\ \ )                  # 2 spaces (column spacing or description spacing).
-            (?P<default_start>
-                \[                  # Square brackets opening.
-                default:            # Starting content within the brackets.
-                \s+                 # Any number of blank chars.
-            )
-            (?P<default_value>.+?)  # Greedy-matching of any string and line returns.
-            (?P<default_end>\])     # Square brackets closing.
-            """,
-            self.colorize,
-            help_text,
-            flags=re.VERBOSE | re.DOTALL,
         )
+        command_aliases = keywords[2]
+        metavars = keywords[-1]
+
+        # Groups whose styling depends on the keywords are dispatched from a mapping
+        # local to this rendering, on top of the styles of the theme.
+        group_style: dict[str, Callable[[str], str]] = dict(self._group_style)
 
-        # Highlight CLI names and commands.
-        for cli_name in self.cli_names:
-            help_text = re.sub(
-                rf"""
-                (\s)                                        # Any blank char.
-                (?P<invoked_command>{re.escape(cli_name)})  # The CLI name.
-                (\s)                                        # Any blank char.
-                """,
-                self.colorize,
-                help_text,
-                flags=re.VERBOSE,
+        # Subcommands' aliases are highlighted individually within their list.
+        if command_aliases:
+            group_style["aliases_list"] = partial(
+                _compile_alias_pattern(command_aliases).sub, self.colorize
             )
 
-        # Highligh sections.
-        # XXX Duplicates Cloup's job, with the only subtlety of not highlighting the
-        # trailing semicolon.
+        # Metavars have the lowest priority: they are only highlighted as a whole if
+        # they contain no other keyword, like choices in ``[apm|apt]``.
+        if metavars:
+            inner_pattern: re.Pattern[str] = _compile_help_pattern(*keywords[:-1], ())
+            inner_colorize = partial(self.colorize, group_style=dict(group_style))
+            metavar_style: Callable[[str], str] = self.theme.metavar
+
+            def style_metavar(metavar: str) -> str:
+                highlighted = inner_pattern.sub(inner_colorize, metavar)
+                if highlighted != metavar:
+                    return highlighted
+                return metavar_style(metavar)
+
+            group_style["metavar"] = style_metavar
+
+        # Highlight in a single scan of the help screen:
+        # - " (Deprecated)" or " (DEPRECATED)" labels, as set by either:
+        #   https://github.com/pallets/click/blob/ef11be6e49e19a055fe7e5a89f0f1f4062c68dba/tests/test_commands.py#L345
+        #   https://github.com/janluke/cloup/blob/c29fa051ed405856ed8bc2dbd733f9df2c8e6418/cloup/formatting/_formatter.py#L188
+        # - subcommands and their aliases,
+        # - defaults,
+        # - CLI names and commands,
+        # - options, choices and metavars.
+        #
+        # XXX Highlighting sections duplicates Cloup's job, with the only subtlety of
+        # not highlighting the trailing semicolon:
         #
         # help_text = re.sub(
         #     r"""
@@ -572,38 +787,22 @@ class HelpExtraFormatter(HelpFormatter):
         #     help_text,
         #     flags=re.VERBOSE | re.MULTILINE,
         # )
-
-        # Highlight keywords.
-        for matching_keywords, style_group_id in (
-            (sorted(self.long_options, reverse=True), "long_option"),
-            (sorted(self.short_options), "short_option"),
-            (sorted(self.choices, reverse=True), "choice"),
-            (sorted(self.metavars, reverse=True), "metavar"),
-        ):
-            for keyword in matching_keywords:
-                keyword = escape_for_help_sceen(keyword)
-                help_text = re.sub(
-                    rf"""
-                    ([               # A keyword is preceded with either:
-                        \s           # - a blank char
-                        \[           # - an opening square bracket (as in choice string)
-                        \|           # - a pipe (again like in choice strings)
-                        \(           # - an opening parenthesis
-                    ])
-                    (?P<{style_group_id}>{keyword})
-                    (\W)             # Any character which is not a word character.
-                    """,
-                    self.colorize,
-                    help_text,
-                    flags=re.VERBOSE,
-                )
+        help_text = _compile_help_pattern(*keywords).sub(
+            partial(self.colorize, group_style=group_style), help_text
+        )
 
         return help_text
 
     def getvalue(self):
         """Wrap original `Click.HelpFormatter.getvalue()` to force extra-colorization on
-        rendering."""
+        rendering.
+
+        Highlighting is skipped if colors are explicitly disabled in the context, as
+        all styling will be stripped on output anyway.
+        """
         help_text = super().getvalue()
+        if self.ctx is not None and self.ctx.color is False:
+            return help_text
         return self.highlight_extra_keywords(help_text)
 
 
@@ -612,30 +811,39 @@ def highlight(string, substrings, styling_method, ignore_case=False):
 
     Takes care of overlapping parts within the ``string``.
     """
-    # Ranges of character indices flagged for highlighting.
+    # Defer import of the heavy regex module to its first use, as most CLIs never
+    # call this function.
+    import regex as re3
+
+    # Ranges of character indices flagged for highlighting, as (start, end) tuples
+    # with exclusive ends.
     ranges = set()
 
+    flags = re3.IGNORECASE if ignore_case else 0
     for part in set(substrings):
         # Search for occurrences of query parts in original string.
-        flags = re3.IGNORECASE if ignore_case else 0
-        ranges |= {
-            f"{match.start()}-{match.end() - 1}"
+        ranges.update(
+            match.span()
             for match in re3.finditer(part, string, flags=flags, overlapped=True)
-        }
-
-    # Reduce ranges, compute complement ranges, transform them to list of integers.
-    ranges = ",".join(ranges)
-    highlight_ranges = int_ranges_from_int_list(ranges)
-    untouched_ranges = int_ranges_from_int_list(
-        complement_int_list(ranges, range_end=len(string))
-    )
-
-    # Apply style to range of characters flagged as matching.
-    styled_str = ""
-    for i, j in sorted(highlight_ranges + untouched_ranges):
-        segment = getitem(string, slice(i, j + 1))
-        if (i, j) in highlight_ranges:
-            segment = styling_method(segment)
-        styled_str += segment
+            if match.end() > match.start()
+        )
 
-    return styled_str
+    # Merge overlapping and contiguous ranges.
+    highlight_ranges: list[list[int]] = []
+    for start, end in sorted(ranges):
+        if highlight_ranges and start <= highlight_ranges[-1][1]:
+            highlight_ranges[-1][1] = max(highlight_ranges[-1][1], end)
+        else:
+            highlight_ranges.append([start, end])
+
+    # Apply style to range of characters flagged as matching, and keep the gaps
+    # between them untouched.
+    segments = []
+    position = 0
+    for start, end in highlight_ranges:
+        segments.append(string[position:start])
+        segments.append(styling_method(string[start:end]))
+        position = end
+    segments.append(string[position:])
+
+    return "".join(segments)
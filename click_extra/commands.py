@@ -115,6 +115,7 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):
         version: str | None = None,
         extra_option_at_end: bool = True,
         populate_auto_envvars: bool = True,
+        help_cache_enabled: bool = False,
         **kwargs: Any,
     ):
         """List of extra parameters:
@@ -133,6 +134,10 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):
         auto-generated environment variables gets displayed in the help screen, fixing
         `click#2483 issue <https://github.com/pallets/click/issues/2483>`_.
 
+        :param help_cache_enabled: caches rendered help screens. Only activate it for
+        commands whose help screen is static. See
+        ``ExtraHelpColorsMixin.help_cache_enabled``.
+
         By default, these context settings are applied:
 
         - ``show_default = True``: `show all default values <https://click.palletsprojects.com/en/8.1.x/api/#click.Context.show_default>`_ in help screen.
@@ -162,6 +167,8 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):
         """
         super().__init__(*args, **kwargs)
 
+        self.help_cache_enabled = help_cache_enabled
+
         default_ctx_settings: Dict[str, Any] = {
             "show_default": True,
             "auto_envvar_prefix": normalize_envvar(self.name),
@@ -20,11 +20,10 @@ from __future__ import annotations
 
 import os
 import subprocess
+from collections import ChainMap
 from pathlib import Path
 from textwrap import indent
-from typing import Iterable, Mapping, Optional, Union, cast
-
-from boltons.iterutils import flatten
+from typing import Any, Iterable, Iterator, Mapping, Optional, Union, cast
 
 from .colorize import default_theme
 
@@ -32,6 +31,16 @@ PROMPT = "► "
 INDENT = " " * len(PROMPT)
 """Some CLI printing constants."""
 
+_INVOKED_COMMAND_OPEN, _INVOKED_COMMAND_CLOSE = default_theme.invoked_command(
+    "\x00"
+).split("\x00")
+_ERROR_OPEN, _ERROR_CLOSE = default_theme.error("\x00").split("\x00")
+"""Pre-rendered ANSI codes surrounding styled text.
+
+Saves us from going through the whole ``Style.__call__`` machinery on each printed
+line.
+"""
+
 
 EnvVars = Mapping[str, Optional[str]]
 
@@ -49,18 +58,37 @@ def args_cleanup(*args: Arg | NestedArgs) -> tuple[str, ...]:
 
     It also allows for nested iterables and ``None`` values as CLI arguments for
     convenience. We just need to flatten and filters them out.
+
+    Nested iterables are walked with an explicit stack of iterators instead of
+    recursive generators, and filtering and casting are done in the same loop.
     """
-    return tuple(str(arg) for arg in flatten(args) if arg is not None)
+    cleaned_args = []
+    stack: list[Iterator[Any]] = [iter(args)]
+    while stack:
+        for arg in stack[-1]:
+            if arg is None:
+                continue
+            # Strings and bytes are iterables, but are leaves of the tree.
+            if isinstance(arg, (str, bytes, Path)) or not hasattr(arg, "__iter__"):
+                cleaned_args.append(str(arg))
+            else:
+                # Descend into the nested iterable, and resume the current one once
+                # it is exhausted.
+                stack.append(iter(arg))
+                break
+        else:
+            stack.pop()
+    return tuple(cleaned_args)
 
 
 def format_cli(cmd, extra_env: EnvVars | None = None) -> str:
     """Simulate CLI rendering in terminal."""
     assert cmd
-    cmd_str = default_theme.invoked_command(" ".join(cmd))
+    cmd_str = f"{_INVOKED_COMMAND_OPEN}{' '.join(cmd)}{_INVOKED_COMMAND_CLOSE}"
 
     extra_env_string = ""
     if extra_env:
-        extra_env_string = "".join(f"{k}={v} " for k, v in extra_env.items())
+        extra_env_string = "".join([f"{k}={v} " for k, v in extra_env.items()])
 
     return f"{PROMPT}{extra_env_string}{cmd_str}"
 
@@ -76,18 +104,24 @@ def print_cli_output(
     if output:
         print(indent(output, INDENT))
     if error:
-        print(indent(default_theme.error(error), INDENT))
+        print(indent(f"{_ERROR_OPEN}{error}{_ERROR_CLOSE}", INDENT))
     if error_code is not None:
-        print(default_theme.error(f"{INDENT}Return code: {error_code}"))
+        print(f"{_ERROR_OPEN}{INDENT}Return code: {error_code}{_ERROR_CLOSE}")
 
 
 def env_copy(extend: EnvVars | None = None) -> EnvVars | None:
-    """Returns a copy of the current environment variables and eventually ``extend`` it.
+    """Returns the current environment variables and eventually ``extend`` them.
 
     Mimics Python's original implementation by returning ``None`` if no ``extend``
     ``dict`` are added. See:
     https://github.com/python/cpython/blob/7b5b429adab4fe0fe81858fe3831f06adc2e2141/Lib/subprocess.py#L1648-L1649
     Environment variables are expected to be a ``dict`` of ``str:str``.
+
+    The result is not a copy but a :py:class:`collections.ChainMap` layering
+    ``extend`` on top of ``os.environ``, so we don't have to duplicate the whole
+    environment for each call. It is a live view: later changes to ``os.environ``
+    are reflected in it, unless shadowed by ``extend``. Writes only land in the
+    ``extend`` layer, which prevents the modification of the global environment.
     """
     if isinstance(extend, dict):
         for k, v in extend.items():
@@ -95,23 +129,47 @@ def env_copy(extend: EnvVars | None = None) -> EnvVars | None:
             assert isinstance(v, str)
     else:
         assert not extend
-    env_copy: EnvVars | None = None
-    if extend:
-        # By casting to dict we make a copy and prevent the modification of the
-        # global environment.
-        env_copy = dict(os.environ)
-        env_copy.update(extend)
-    return env_copy
+    if not extend:
+        return None
+    # Values of extend have all been checked to be strings above.
+    env_layers: ChainMap[str, str] = ChainMap(
+        cast("dict[str, str]", dict(extend)), os.environ
+    )
+    return env_layers
 
 
-def run_cmd(*args, extra_env: EnvVars | None = None, print_output: bool = True):
-    """Run a system command, print output and return results."""
+def run_cmd(
+    *args,
+    extra_env: EnvVars | None = None,
+    print_output: bool = True,
+    capture: bool = True,
+):
+    """Run a system command, print output and return results.
+
+    If ``capture`` is ``False``, ``<stdin>``, ``<stdout>`` and ``<stderr>`` of the
+    command are redirected to ``os.devnull``, so no output is buffered nor decoded.
+    Output is then returned as empty strings, and only the return code is meaningful.
+    """
     assert isinstance(args, tuple)
+    env = cast("subprocess._ENV", env_copy(extra_env))
+
+    if not capture:
+        return_code = subprocess.run(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        ).returncode
+        if print_output:
+            print_cli_output(args, error_code=return_code, extra_env=extra_env)
+        return return_code, "", ""
+
     process = subprocess.run(
         args,
         capture_output=True,
         encoding="utf-8",
-        env=cast("subprocess._ENV", env_copy(extra_env)),
+        env=env,
     )
 
     if print_output:
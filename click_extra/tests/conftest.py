@@ -19,42 +19,58 @@
 from __future__ import annotations
 
 import os
+import re
+from contextlib import redirect_stdout
 from functools import partial
+from io import StringIO
 from pathlib import Path
 from textwrap import dedent
-from typing import IO, Any, Sequence
+from typing import IO, TYPE_CHECKING, Any, Sequence
+from weakref import WeakKeyDictionary
 
 import click
 import click.testing
 import cloup
 import pytest
-from boltons.strutils import strip_ansi
-from boltons.tbutils import ExceptionInfo
 
 from ..decorators import command, extra_command, extra_group, group
 from ..platforms import is_linux, is_macos, is_windows
 from ..run import EnvVars, args_cleanup, print_cli_output
 
-DESTRUCTIVE_MODE = bool(
-    os.environ.get("DESTRUCTIVE_TESTS", False) not in {True, 1, "True", "true", "1"}
-)
+if TYPE_CHECKING:
+    # typing.Final is only available from Python 3.8.
+    from typing import Final
+
+_TRUTHY: Final = frozenset(("1", "true", "yes"))
+"""Lower-cased values of environment variables considered as ``True``."""
+
+
+DESTRUCTIVE_MODE: Final = os.environ.get("DESTRUCTIVE_TESTS", "").lower() in _TRUTHY
 """Pre-computed boolean flag indicating if destructive mode is activated by the presence
-of a ``DESTRUCTIVE_TESTS`` environment variable set to ``True``."""
+of a ``DESTRUCTIVE_TESTS`` environment variable set to ``1``, ``true`` or ``yes``, in
+any case."""
 
 
-destructive = pytest.mark.skipif(DESTRUCTIVE_MODE, reason="destructive test")
+destructive = pytest.mark.skipif(not DESTRUCTIVE_MODE, reason="destructive test")
 """Pytest mark to skip a test unless destructive mode is allowed.
 
+Tests carrying this mark are also all put in the same ``destructive`` xdist group by
+:py:func:`pytest_collection_modifyitems`. So they are run serially on the same worker,
+but only if tests are distributed with ``--dist=loadgroup``. The grouping has no effect
+under the default ``--dist=loadfile`` mode. To run destructive tests serially:
+
+.. code-block:: shell-session
+
+    $ DESTRUCTIVE_TESTS=true pytest --dist=loadgroup
+
 .. todo:
 
     Test destructive test assessment.
 """
 
 
-non_destructive = pytest.mark.skipif(
-    not DESTRUCTIVE_MODE, reason="non-destructive test"
-)
-"""Pytest mark to skip a test unless destructive mode is allowed.
+non_destructive = pytest.mark.skipif(DESTRUCTIVE_MODE, reason="non-destructive test")
+"""Pytest mark to skip a test if destructive mode is allowed.
 
 .. todo:
 
@@ -62,23 +78,33 @@ non_destructive = pytest.mark.skipif(
 """
 
 
-skip_linux = pytest.mark.skipif(is_linux(), reason="Skip Linux")
+IS_LINUX: Final = is_linux()
+"""Pre-computed boolean flag indicating if tests are run on a Linux system."""
+
+IS_MACOS: Final = is_macos()
+"""Pre-computed boolean flag indicating if tests are run on a macOS system."""
+
+IS_WINDOWS: Final = is_windows()
+"""Pre-computed boolean flag indicating if tests are run on a Windows system."""
+
+
+skip_linux = pytest.mark.skipif(IS_LINUX, reason="Skip Linux")
 """Pytest mark to skip a test if run on a Linux system."""
 
-skip_macos = pytest.mark.skipif(is_macos(), reason="Skip macOS")
+skip_macos = pytest.mark.skipif(IS_MACOS, reason="Skip macOS")
 """Pytest mark to skip a test if run on a macOS system."""
 
-skip_windows = pytest.mark.skipif(is_windows(), reason="Skip Windows")
+skip_windows = pytest.mark.skipif(IS_WINDOWS, reason="Skip Windows")
 """Pytest mark to skip a test if run on a Windows system."""
 
 
-unless_linux = pytest.mark.skipif(not is_linux(), reason="Linux required")
+unless_linux = pytest.mark.skipif(not IS_LINUX, reason="Linux required")
 """Pytest mark to skip a test unless it is run on a Linux system."""
 
-unless_macos = pytest.mark.skipif(not is_macos(), reason="macOS required")
+unless_macos = pytest.mark.skipif(not IS_MACOS, reason="macOS required")
 """Pytest mark to skip a test unless it is run on a macOS system."""
 
-unless_windows = pytest.mark.skipif(not is_windows(), reason="Windows required")
+unless_windows = pytest.mark.skipif(not IS_WINDOWS, reason="Windows required")
 """Pytest mark to skip a test unless it is run on a Windows system."""
 
 
@@ -124,22 +150,140 @@ class ExtraCliRunner(click.testing.CliRunner):
         )
 
         if result.exception:
+            # Defer import of boltons' traceback utilities to the rare CLI raising an
+            # exception.
+            from boltons.tbutils import ExceptionInfo
+
             print(ExceptionInfo.from_exc_info(*result.exc_info).get_formatted())
 
         return result
 
 
+_RUNNER_KEY = pytest.StashKey[ExtraCliRunner]()
+"""Key of the shared CLI runner in pytest's configuration stash."""
+
+
+def pytest_configure(config):
+    """Initialize the CLI runner shared by all tests, once per process.
+
+    Under ``pytest-xdist``, each worker process gets its own runner.
+    """
+    config.stash[_RUNNER_KEY] = ExtraCliRunner(mix_stderr=False)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items):
+    """Add destructive tests to the ``destructive`` xdist group.
+
+    Runs before ``pytest-xdist`` reads the groups of collected items.
+    """
+    for item in items:
+        if destructive.mark in item.iter_markers(name="skipif"):
+            item.add_marker(pytest.mark.xdist_group("destructive"))
+
+
+@pytest.fixture(scope="session")
+def session_runner(pytestconfig):
+    """A CLI runner shared by all tests of the session.
+
+    It is not isolated from the filesystem. Use the ``runner`` fixture instead to run
+    CLIs in a temporary directory.
+    """
+    return pytestconfig.stash[_RUNNER_KEY]
+
+
 @pytest.fixture
-def runner():
-    runner = ExtraCliRunner(mix_stderr=False)
-    with runner.isolated_filesystem():
-        yield runner
+def runner(session_runner, tmp_path, monkeypatch):
+    """The shared CLI runner, with the current working directory set to a fresh
+    temporary directory for the duration of the test."""
+    monkeypatch.chdir(tmp_path)
+    return session_runner
+
+
+ANSI_BYTES_REGEX = re.compile(
+    rb"""
+    \x1b            # Sequence starts with ESC.
+    (?:
+        [@-Z\\-_]   # Second byte in the 0x40-0x5F range, but the CSI char.
+    |
+        \[          # Or CSI sequences, starting with [
+        [0-?]*      # Parameter bytes.
+        [ -/]*      # Intermediate bytes.
+        [@-~]       # Final byte.
+    )
+    """,
+    flags=re.VERBOSE,
+)
+"""Matches ANSI escape sequences in raw bytes.
+
+Same as ``boltons.strutils.ANSI_SEQUENCES``, but applies to the output of
+``CliRunner.invoke()`` as-is, without decoding and re-encoding it. This is safe with
+UTF-8 content as multibyte characters never contain ASCII bytes."""
+
+
+_PROG_NAME_CACHE: WeakKeyDictionary[click.core.BaseCommand, str] = WeakKeyDictionary()
+"""Default program name of each CLI invoked by tests.
+
+Weakly referenced, so an entry can't outlive its CLI and be confused with another one
+later allocated at the same address."""
+
+
+class InvokeResult(click.testing.Result):
+    """A ``click.testing.Result`` whose output streams are decoded once and for all.
+
+    As ``<stderr>`` is not mixed in by our runner, the output is ``<stdout>`` alone.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stdout = super().stdout
+        self._stderr = super().stderr
+
+    @property
+    def output(self) -> str:
+        return self._stdout
+
+    @property
+    def stdout(self) -> str:
+        return self._stdout
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr
+
+
+_INVOCATIONS_KEY = pytest.StashKey["list[tuple[Any, ...]]"]()
+"""Key of the CLI invocations of a test, kept to be reported if the test fails."""
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Report the CLIs run by the ``invoke`` fixture in failing tests."""
+    outcome = yield
+    if call.when != "call":
+        return
+
+    invocations = item.stash.get(_INVOCATIONS_KEY, None)
+    if not invocations:
+        return
+    del item.stash[_INVOCATIONS_KEY]
+
+    report = outcome.get_result()
+    if report.failed:
+        with redirect_stdout(StringIO()) as buffer:
+            for invocation in invocations:
+                print_cli_output(*invocation)
+        report.sections.append(("Captured invoke call", buffer.getvalue()))
 
 
 @pytest.fixture
-def invoke(runner, monkeypatch):
+def invoke(runner, monkeypatch, request):
     """Executes Click's CLI, print output and return results.
 
+    The CLI and its output are printed right away if pytest is run in verbose mode.
+    Otherwise they are only formatted and reported if the test fails, in a ``Captured
+    invoke call`` section, as pytest would discard them anyway on passing tests.
+
     If ``color=False`` both ``<stdout>`` and ``<stderr>`` are stripped out of ANSI
     codes.
 
@@ -149,6 +293,8 @@ def invoke(runner, monkeypatch):
     <https://github.com/pallets/click/issues/2110>`_ of
     ``click.testing.CliRunner.invoke()``.
     """
+    verbose = request.config.getoption("verbose") > 0
+
     def _run(cli, *args, env: EnvVars | None = None, color=None):
         # We allow for nested iterables and None values as args for
         # convenience. We just need to flatten and filters them out.
@@ -167,19 +313,47 @@ def invoke(runner, monkeypatch):
 
             result = runner.invoke(cli=cli, args=args, env=env, color=bool(color))
 
-        # Force stripping of all colors from results.
+        stdout_bytes = result.stdout_bytes
+        stderr_bytes = result.stderr_bytes
+
+        # Force stripping of all colors from results. Streams without any escape
+        # character are left untouched, as a plain substring search is cheaper than
+        # running the regex engine on them.
         if color is False:
-            result.stdout_bytes = strip_ansi(result.stdout_bytes)
-            result.stderr_bytes = strip_ansi(result.stderr_bytes)
+            if b"\x1b" in stdout_bytes:
+                stdout_bytes = ANSI_BYTES_REGEX.sub(b"", stdout_bytes)
+            if b"\x1b" in stderr_bytes:
+                stderr_bytes = ANSI_BYTES_REGEX.sub(b"", stderr_bytes)
+
+        result = InvokeResult(
+            runner=result.runner,
+            stdout_bytes=stdout_bytes,
+            stderr_bytes=stderr_bytes,
+            return_value=result.return_value,
+            exit_code=result.exit_code,
+            exception=result.exception,
+            exc_info=result.exc_info,
+        )
+
+        prog_name = _PROG_NAME_CACHE.get(cli)
+        if prog_name is None:
+            prog_name = runner.get_default_prog_name(cli)
+            _PROG_NAME_CACHE[cli] = prog_name
 
-        print_cli_output(
-            [runner.get_default_prog_name(cli)] + list(args),
+        invocation = (
+            (prog_name, *args),
             result.output,
             result.stderr,
             result.exit_code,
         )
+        if verbose:
+            print_cli_output(*invocation)
+        else:
+            request.node.stash.setdefault(_INVOCATIONS_KEY, []).append(invocation)
+
+        if result.exception and result.exc_info:
+            from boltons.tbutils import ExceptionInfo
 
-        if result.exception:
             print(ExceptionInfo.from_exc_info(*result.exc_info).get_formatted())
 
         return result
@@ -27,6 +27,8 @@ from pytest_cases import parametrize
 
 from .. import HelpTheme, Style, argument, echo, option, option_group, secho, style
 from ..colorize import (
+    KO,
+    OK,
     HelpExtraFormatter,
     HelpExtraTheme,
     default_theme,
@@ -60,6 +62,12 @@ def test_theme_definition():
     assert log_levels.isdisjoint(HelpTheme._fields)
 
 
+def test_pre_rendered_ui_elements():
+    """Check hard-coded UI elements are in sync with the default theme."""
+    assert OK == default_theme.success("✓")
+    assert KO == default_theme.error("✘")
+
+
 def test_options_highlight():
     formatter = HelpExtraFormatter()
     formatter.write("applies filtering by --manager and --exclude options")
@@ -91,6 +99,38 @@ def test_choices_highlight():
     assert default_theme.choice("brew") in output
 
 
+def test_subcommand_aliases_highlight():
+    formatter = HelpExtraFormatter()
+    formatter.write(
+        "  install (add, i)  Install a package (see the add option).\n"
+        "  remove (rm)       Remove a package.\n"
+    )
+
+    formatter.subcommands = {"install", "remove"}
+    formatter.command_aliases = {"add", "i", "rm"}
+
+    output = formatter.getvalue()
+    assert output == (
+        f"  {default_theme.option('install')} ({default_theme.option('add')}, "
+        f"{default_theme.option('i')})  Install a package (see the add option).\n"
+        f"  {default_theme.option('remove')} ({default_theme.option('rm')})"
+        "       Remove a package.\n"
+    )
+
+
+def test_aliases_highlight_without_subcommands():
+    formatter = HelpExtraFormatter()
+    formatter.write("  install (add, i)  Install a package.\n")
+
+    formatter.command_aliases = {"add", "i"}
+
+    output = formatter.getvalue()
+    assert output == (
+        f"  install ({default_theme.option('add')}, {default_theme.option('i')})"
+        "  Install a package.\n"
+    )
+
+
 def test_metavars_highlight():
     formatter = HelpExtraFormatter()
     formatter.write("-v, --verbosity LEVEL   Either CRITICAL, ERROR or DEBUG.")
@@ -101,6 +141,37 @@ def test_metavars_highlight():
     assert default_theme.metavar("LEVEL") in output
 
 
+def test_unsorted_keywords_highlight():
+    formatter = HelpExtraFormatter()
+    formatter.write("  --foo-bar  Same as --foo.\n")
+
+    # Shortest keyword first.
+    formatter.long_options = ("--foo", "--foo-bar")
+
+    output = formatter.getvalue()
+    assert output == (
+        f"  {default_theme.option('--foo-bar')}  Same as "
+        f"{default_theme.option('--foo')}.\n"
+    )
+
+
+def test_choices_precedence_highlight():
+    formatter = HelpExtraFormatter()
+    formatter.write("  --level [a|b|ab]  Level.  [default: ab]\n")
+
+    formatter.long_options = ("--level",)
+    formatter.choices = ("ab", "a", "b")
+    formatter.metavars = ("[a|b|ab]",)
+
+    output = formatter.getvalue()
+    assert output == (
+        f"  {default_theme.option('--level')} [{default_theme.choice('a')}|"
+        f"{default_theme.choice('b')}|{default_theme.choice('ab')}]  Level.  "
+        f"{default_theme.metavar('[default: ')}{default_theme.choice('ab')}"
+        f"{default_theme.metavar(']')}\n"
+    )
+
+
 def test_only_full_word_highlight():
     formatter = HelpExtraFormatter()
     formatter.write("package snapshot")
@@ -112,6 +183,17 @@ def test_only_full_word_highlight():
     assert strip_ansi(output) == output
 
 
+def test_no_highlight_without_colors():
+    formatter = HelpExtraFormatter()
+    formatter.write("applies filtering by --manager and --exclude options")
+
+    formatter.long_options = {"--manager", "--exclude"}
+    formatter.ctx = click.Context(click.Command("cli"), color=False)
+
+    output = formatter.getvalue()
+    assert strip_ansi(output) == output
+
+
 @skip_windows_colors
 def test_keyword_collection(invoke):
     # Create a dummy Click CLI.
@@ -512,3 +594,58 @@ def test_standalone_help_option(invoke, cmd_decorator, cmd_type, option_decorato
               -h, --help  Show this message and exit.
             """
         )
+
+
+def test_help_cache(invoke, monkeypatch):
+    @extra_command(params=None)
+    @option("--name", help="Name to greet.")
+    def cached_help(name):
+        echo("It works!")
+
+    rendered = []
+    original_format_help = cached_help.format_help
+
+    def format_help(ctx, formatter):
+        rendered.append(ctx.command_path)
+        return original_format_help(ctx, formatter)
+
+    monkeypatch.setattr(cached_help, "format_help", format_help)
+
+    # Cache is disabled by default.
+    first = invoke(cached_help, "--help", color=True)
+    second = invoke(cached_help, "--help", color=True)
+    assert len(rendered) == 2
+    assert first.stdout == second.stdout
+
+    cached_help.help_cache_enabled = True
+    third = invoke(cached_help, "--help", color=True)
+    fourth = invoke(cached_help, "--help", color=True)
+    assert len(rendered) == 3
+    assert third.exit_code == fourth.exit_code == 0
+    assert first.stdout == third.stdout == fourth.stdout
+
+    # Help screens are cached separately for each color flag of the context.
+    invoke(cached_help, "--help", color="forced")
+    assert len(rendered) == 4
+    invoke(cached_help, "--help", color="forced")
+    assert len(rendered) == 4
+
+    cached_help.clear_help_cache()
+    invoke(cached_help, "--help", color=True)
+    assert len(rendered) == 5
+
+
+@pytest.mark.parametrize("cmd_decorator", (extra_command, extra_group))
+def test_help_cache_parameter(invoke, cmd_decorator):
+    @cmd_decorator(params=None, help_cache_enabled=True)
+    def cached_help():
+        echo("It works!")
+
+    assert cached_help.help_cache_enabled is True
+
+    first = invoke(cached_help, "--help", color=True)
+    second = invoke(cached_help, "--help", color=True)
+    assert first.exit_code == second.exit_code == 0
+    assert first.stdout == second.stdout
+
+    cached_help.clear_help_cache()
@@ -19,6 +19,7 @@
 from __future__ import annotations
 
 import os
+import sys
 from pathlib import Path
 
 import click
@@ -27,7 +28,7 @@ from pytest_cases import fixture, parametrize
 from .. import Style, echo, pass_context, secho, style
 from ..logging import logger
 from ..platforms import is_windows
-from ..run import env_copy
+from ..run import args_cleanup, env_copy, run_cmd
 from .conftest import command_decorators, skip_windows_colors
 
 
@@ -43,6 +44,86 @@ def test_temporary_fs(runner):
     assert not str(Path(__file__)).startswith(str(Path.cwd()))
 
 
+def test_destructive_xdist_group(pytester):
+    """Check destructive tests are put in their own xdist group."""
+    pytester.makeconftest(
+        "from click_extra.tests.conftest import pytest_collection_modifyitems"
+    )
+    pytester.makepyfile(
+        """
+        from click_extra.tests.conftest import destructive
+
+        @destructive
+        def test_destructive():
+            pass
+
+        def test_regular():
+            pass
+        """
+    )
+    items, _ = pytester.inline_genitems()
+    groups = {
+        item.name: [mark.args for mark in item.iter_markers(name="xdist_group")]
+        for item in items
+    }
+    assert groups == {"test_destructive": [("destructive",)], "test_regular": []}
+
+
+def test_invoke_report_on_failure(pytester):
+    """Check CLIs run by a failing test are reported, even if they exited cleanly."""
+    pytester.makeconftest('pytest_plugins = ["click_extra.tests.conftest"]')
+    pytester.makepyfile(
+        """
+        import click
+
+        @click.command
+        def cli():
+            click.echo("It works!")
+
+        def test_pass(invoke):
+            assert invoke(cli, "--foo-pass").exit_code == 2
+
+        def test_fail(invoke):
+            assert invoke(cli).exit_code == 0
+            assert False
+        """
+    )
+    result = pytester.runpytest("-p", "no:xdist")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*- Captured invoke call -*",
+            "*cli*",
+            "*It works!*",
+            "*Return code: 0*",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*--foo-pass*")
+
+
+def test_invoke_result(invoke):
+    @click.command
+    def cli():
+        secho("It works!", fg="green")
+        echo("Error!", err=True)
+
+    result = invoke(cli, color=False)
+    assert isinstance(result, click.testing.Result)
+    assert result.exit_code == 0
+    assert result.output == result.stdout == "It works!\n"
+    assert result.stdout_bytes == b"It works!\n"
+    assert result.stderr == "Error!\n"
+    assert result.return_value is None
+
+
+def test_args_cleanup():
+    assert args_cleanup() == ()
+    assert args_cleanup(None, [], ((None,),)) == ()
+    assert args_cleanup(
+        "a", None, ["b", ("c", None, [Path("d"), 1])], "e", [[["f"]]]
+    ) == ("a", "b", "c", "d", "1", "e", "f")
+
+
 def test_env_copy():
     env_var = "MPM_DUMMY_ENV_VAR_93725"
     assert env_var not in os.environ
@@ -55,6 +136,30 @@ def test_env_copy():
     assert extended_env[env_var] == "yo"
     assert env_var not in os.environ
 
+    # Extended environment is properly passed to subprocesses.
+    code, output, error = run_cmd(
+        sys.executable,
+        "-c",
+        f"import os; print(os.environ['{env_var}'])",
+        extra_env={env_var: "yo"},
+    )
+    assert code == 0
+    assert output == "yo\n"
+    assert not error
+    assert env_var not in os.environ
+
+
+def test_run_cmd_no_capture():
+    code, output, error = run_cmd(
+        sys.executable,
+        "-c",
+        "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)",
+        capture=False,
+    )
+    assert code == 3
+    assert output == ""
+    assert error == ""
+
 
 @click.command
 @pass_context